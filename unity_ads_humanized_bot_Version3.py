@@ -7,7 +7,7 @@ Description:
 - Watches interstitial and rewarded ads in a test APK using Appium.
 - Alternates between clicking "Interstitial" and "Rewarded" ad buttons (odd/even views).
 - Simulates highly advanced human-like behavior: random tap jitter, adaptive delays, idle time, and randomized viewing patterns.
-- Analyses and finds ALL possible cross/close/dismiss/skip buttons using advanced heuristics (text, description, resource-id, class).
+- Analyses and finds ALL possible cross/close/dismiss/skip buttons using advanced heuristics (resource-id, description, text).
 - Controlled via Telegram bot for real-time status and control.
 - Each proxy/device performs 100 views per hour and pauses until the next hour.
 - Next-level humanization: curved swipes, session diversity, device/network fingerprinting, sensor simulation, and more.
@@ -18,27 +18,56 @@ Setup/How to get parameters:
 - APP_PACKAGE: Run 'aapt dump badging your_app.apk | grep package' or 'adb shell pm list packages' to find your app's package name.
 - APP_ACTIVITY: Run 'aapt dump badging your_app.apk | grep launchable-activity' or 'adb shell dumpsys window | grep mCurrentFocus' to find the app's main activity.
 - APPIUM_SERVER: Default is 'http://localhost:4723/wd/hub'. Change if your Appium runs elsewhere.
+- INTERSTITIAL_ACCESSIBILITY_ID / REWARDED_ACCESSIBILITY_ID: The ad buttons are looked up by accessibility id.
+  If the test APK's buttons lack one, add it in the layout XML, e.g.
+  `android:contentDescription="btn_interstitial"` on the Interstitial button (and "btn_rewarded" on Rewarded).
+- Interpreter: Python 3.10+. Each proxy's Appium calls and page-source parsing run on its own worker thread;
+  under a free-threaded build (e.g. `python3.13t`) these run truly in parallel instead of sharing the GIL.
 """
 
+import asyncio
+import atexit
 import time
 import random
 import datetime
 import logging
+import re
 import sys
 import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
 from threading import Thread, Lock
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
 from typing import Dict, Any, List, Optional
 
 from appium import webdriver
+from lxml import etree
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.common.actions import interaction
+from selenium.webdriver.common.actions.action_builder import ActionBuilder
+from selenium.webdriver.common.actions.pointer_input import PointerInput
 from telegram.ext import Updater, CommandHandler, CallbackContext
 from telegram import Update, ParseMode
 
 # ================== Logger Setup =========================
+# Workers only enqueue records; a single listener thread does the actual writes.
+_log_queue: SimpleQueue = SimpleQueue()
+_log_output = logging.StreamHandler()
+_log_output.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+_log_listener = QueueListener(_log_queue, _log_output)
+# QueueHandler.prepare() bakes its formatted text into record.msg; keep that to the
+# bare message so only the listener's handler applies the full format.
+_log_enqueue = QueueHandler(_log_queue)
+_log_enqueue.setFormatter(logging.Formatter('%(message)s'))
 logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO
+    level=logging.INFO,
+    handlers=[_log_enqueue]
 )
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger("UnityAdsHumanizedBot")
 
 # ================== Global Configuration =================
@@ -47,14 +76,21 @@ DEVICE_NAME_PREFIX = 'emulator-5554'  # See setup instructions above
 APP_PACKAGE = 'com.example.base'       # See setup instructions above
 APP_ACTIVITY = 'com.example.MainActivity'  # See setup instructions above
 APPIUM_SERVER = 'http://localhost:4723/wd/hub'
+INTERSTITIAL_ACCESSIBILITY_ID = 'btn_interstitial'  # See setup instructions above
+REWARDED_ACCESSIBILITY_ID = 'btn_rewarded'          # See setup instructions above
 
 PROXIES = [f'proxy_{i+1}' for i in range(5)]
 MAX_VIEWS_PER_HOUR = 100
 MAX_TOTAL_VIEWS_PER_PROXY = 5000
 
-proxy_view_count = defaultdict(int)
-proxy_total_count = defaultdict(int)
-proxy_lock = Lock()
+proxy_view_count: Dict[str, int] = {p: 0 for p in PROXIES}
+proxy_total_count: Dict[str, int] = {p: 0 for p in PROXIES}
+# Workers run as coroutines on one event loop (see _run_event_loop); blocking
+# Appium calls are pushed to worker threads with asyncio.to_thread.
+_loop = asyncio.new_event_loop()
+# One condition (and lock) per proxy: workers never wait on each other's counters,
+# and a capped worker sleeps until the hourly reset notifies it.
+proxy_cvs: Dict[str, asyncio.Condition] = {p: asyncio.Condition() for p in PROXIES}
 bot_start_time = datetime.datetime.now()
 
 # ========== Humanization Parameters ==========
@@ -83,68 +119,115 @@ def get_uptime() -> str:
     delta = datetime.datetime.now() - bot_start_time
     return str(delta).split('.')[0]
 
-def random_sleep(min_sec: float, max_sec: float, reason: str = "delay"):
+# Sleeps shorter than this (post-tap pauses etc.) are only logged at DEBUG.
+SLEEP_LOG_THRESHOLD = 2.0
+
+def _log_sleep(sleep_time: float, reason: str):
+    level = logging.INFO if sleep_time >= SLEEP_LOG_THRESHOLD else logging.DEBUG
+    logger.log(level, "Sleeping for %.2f seconds (%s, humanized)", sleep_time, reason)
+
+async def random_sleep(min_sec: float, max_sec: float, reason: str = "delay"):
     sleep_time = random.uniform(min_sec, max_sec)
-    logger.info(f"Sleeping for {sleep_time:.2f} seconds ({reason}, humanized)")
-    time.sleep(sleep_time)
+    _log_sleep(sleep_time, reason)
+    await asyncio.sleep(sleep_time)
 
-def maybe_idle():
+async def humanized_wait(min_sec: float, max_sec: float, reason: str = "delay"):
+    # random_sleep plus the occasional human idle, rolled up-front into one sleep.
+    sleep_time = random.uniform(min_sec, max_sec)
     if random.random() < HUMAN_SLEEP_VARIANCE["idle_chance"]:
-        t = random.uniform(*HUMAN_SLEEP_VARIANCE["idle_time"])
-        logger.info(f"Simulating human idle (touching nothing) for {t:.2f}s...")
-        time.sleep(t)
-
-def human_tap(driver, element):
-    loc = element.location
-    size = element.size
-    x = loc['x'] + random.randint(5, max(6, size['width'] - 10))
-    y = loc['y'] + random.randint(5, max(6, size['height'] - 10))
+        idle = random.uniform(*HUMAN_SLEEP_VARIANCE["idle_time"])
+        logger.info(f"Simulating human idle (touching nothing) for {idle:.2f}s...")
+        sleep_time += idle
+    _log_sleep(sleep_time, reason)
+    await asyncio.sleep(sleep_time)
+
+# Element geometry keyed by the server-issued element id; one `rect` GET instead of
+# separate `location` and `size` calls, skipped entirely on repeat taps.
+_RECT_CACHE_SIZE = 256
+_rect_cache: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+_rect_cache_lock = Lock()
+
+def _element_rect(element) -> Dict[str, int]:
+    with _rect_cache_lock:
+        rect = _rect_cache.get(element.id)
+        if rect is not None:
+            _rect_cache.move_to_end(element.id)
+            return rect
+    rect = element.rect
+    with _rect_cache_lock:
+        _rect_cache[element.id] = rect
+        if len(_rect_cache) > _RECT_CACHE_SIZE:
+            _rect_cache.popitem(last=False)
+    return rect
+
+async def human_tap(driver, element):
+    rect = await asyncio.to_thread(_element_rect, element)
+    await human_tap_rect(driver, rect)
+
+async def human_tap_rect(driver, rect: Dict[str, int]):
+    x = rect['x'] + random.randint(5, max(6, rect['width'] - 10))
+    y = rect['y'] + random.randint(5, max(6, rect['height'] - 10))
     logger.info(f"Human-like tap at ({x}, {y}) with jitter")
+    await asyncio.to_thread(_perform_tap, driver, x, y)
+    await random_sleep(*HUMAN_SLEEP_VARIANCE['tap'], reason="post-tap")
+
+def _touch_actions(driver) -> ActionChains:
+    # W3C touch pointer: a whole gesture goes to Appium as one `actions` request.
+    actions = ActionChains(driver)
+    actions.w3c_actions = ActionBuilder(driver, mouse=PointerInput(interaction.POINTER_TOUCH, "touch"))
+    return actions
+
+def _perform_tap(driver, x: int, y: int):
     try:
-        driver.tap([(x, y)], random.uniform(*HUMAN_SLEEP_VARIANCE['tap']))
+        actions = _touch_actions(driver)
+        pointer = actions.w3c_actions.pointer_action
+        pointer.move_to_location(x, y)
+        pointer.pointer_down()
+        pointer.pointer_up()
+        actions.perform()
     except Exception as e:
-        logger.warning(f"driver.tap failed: {e}, fallback to TouchAction")
-        try:
-            from appium.webdriver.common.touch_action import TouchAction
-            TouchAction(driver).tap(x=x, y=y).perform()
-        except Exception as e2:
-            logger.error(f"TouchAction fallback failed: {e2}")
-    random_sleep(*HUMAN_SLEEP_VARIANCE['tap'], reason="post-tap")
+        logger.error(f"W3C tap failed: {e}")
 
 # --------- Next-Level Humanization Extensions ---------
 
+_SWIPE_JITTER = range(-10, 11)
+
 def advanced_human_swipe(driver):
     # Generate human-like swipe with random speed and path (curved)
     x1, y1 = random.randint(100, 300), random.randint(300, 800)
     x2, y2 = x1 + random.randint(-50, 150), y1 + random.randint(-100, 250)
     duration = random.randint(800, 1800)  # ms
     try:
-        from appium.webdriver.common.touch_action import TouchAction
-        action = TouchAction(driver)
-        action.press(x=x1, y=y1).wait(ms=duration)
-        # Simulate a curve by stepping
+        actions = _touch_actions(driver)
+        pointer = actions.w3c_actions.pointer_action
+        pointer.move_to_location(x1, y1)
+        pointer.pointer_down()
+        pointer.pause(duration / 1000)
+        # Simulate a curve by stepping; draw all waypoint jitter in one call
+        jitter = random.choices(_SWIPE_JITTER, k=10)
         for i in range(1, 6):
-            mid_x = int(x1 + i * (x2 - x1)/6 + random.randint(-10, 10))
-            mid_y = int(y1 + i * (y2 - y1)/6 + random.randint(-10, 10))
-            action.move_to(x=mid_x, y=mid_y)
-        action.release().perform()
+            mid_x = int(x1 + i * (x2 - x1)/6 + jitter[2 * i - 2])
+            mid_y = int(y1 + i * (y2 - y1)/6 + jitter[2 * i - 1])
+            pointer.move_to_location(mid_x, mid_y)
+        pointer.pointer_up()
+        actions.perform()
         logger.info(f"Performed advanced human swipe from ({x1},{y1}) to ({x2},{y2})")
     except Exception as e:
         logger.warning(f"Advanced swipe failed: {e}")
 
-def simulate_device_event(driver):
+async def simulate_device_event(driver):
     # Simulate home button, rotate, or notification
     r = random.random()
     try:
         if r < 0.15:
-            driver.press_keycode(3)  # Home
-            time.sleep(random.uniform(1, 4))
-            driver.launch_app()
+            await asyncio.to_thread(driver.press_keycode, 3)  # Home
+            await asyncio.sleep(random.uniform(1, 4))
+            await asyncio.to_thread(driver.launch_app)
             logger.info("Simulated Home button and relaunch.")
         elif r < 0.25:
-            driver.rotate(screenOrientation='landscape')
-            time.sleep(random.uniform(0.5, 2))
-            driver.rotate(screenOrientation='portrait')
+            await asyncio.to_thread(driver.rotate, screenOrientation='landscape')
+            await asyncio.sleep(random.uniform(0.5, 2))
+            await asyncio.to_thread(driver.rotate, screenOrientation='portrait')
             logger.info("Simulated device rotate (landscape/portrait).")
     except Exception as e:
         logger.warning(f"simulate_device_event failed: {e}")
@@ -168,22 +251,29 @@ def ai_driven_humanization():
 
 # ========== Appium Setup Functions ==========
 
+_BASE_CAPS: Dict[str, Any] = {
+    'platformName': 'Android',
+    'appPackage': APP_PACKAGE,
+    'appActivity': APP_ACTIVITY,
+    'noReset': True,
+    'automationName': 'UiAutomator2',
+}
+_PROXY_CAPS: Dict[str, Dict[str, Any]] = {
+    p: {**_BASE_CAPS, 'deviceName': f'{DEVICE_NAME_PREFIX}_{p}'} for p in PROXIES
+}
+
 def get_desired_caps(proxy_id: str) -> Dict[str, Any]:
-    randomize_device_fingerprint()  # Humanize before each session
-    return {
-        'platformName': 'Android',
-        'deviceName': f'{DEVICE_NAME_PREFIX}_{proxy_id}',
-        'appPackage': APP_PACKAGE,
-        'appActivity': APP_ACTIVITY,
-        'noReset': True,
-        'automationName': 'UiAutomator2',
-    }
+    # Fresh copy so a session can adjust its caps without touching the template.
+    return dict(_PROXY_CAPS[proxy_id])
 
 def create_driver(proxy_id: str):
     caps = get_desired_caps(proxy_id)
+    randomize_device_fingerprint()  # Humanize before each session
     logger.info(f"Connecting to Appium server for {proxy_id} with caps: {caps}")
     try:
-        driver = webdriver.Remote(APPIUM_SERVER, caps)
+        # Keep-alive is already the client default; additionally talk to the device
+        # node directly if the server advertises directConnect.
+        driver = webdriver.Remote(APPIUM_SERVER, caps, direct_connection=True)
         logger.info(f"Appium driver for {proxy_id} started successfully.")
         return driver
     except Exception as e:
@@ -192,74 +282,193 @@ def create_driver(proxy_id: str):
 
 # ========== Proxy/Device Management ==========
 
-def reset_views_hourly():
-    while True:
-        now = datetime.datetime.now()
-        next_hour = (now + datetime.timedelta(hours=1)).replace(minute=0, second=0, microsecond=0)
-        wait_time = (next_hour - now).total_seconds()
-        logger.info(f"Sleeping until next hour to reset views ({wait_time/60:.2f} min)")
-        time.sleep(wait_time)
-        with proxy_lock:
-            for k in proxy_view_count:
-                proxy_view_count[k] = 0
-            logger.info("✅ View counts reset for new hour.")
+def _seconds_until_next_hour() -> float:
+    now = datetime.datetime.now()
+    next_hour = (now + datetime.timedelta(hours=1)).replace(minute=0, second=0, microsecond=0)
+    return (next_hour - now).total_seconds()
+
+async def _reset_counts():
+    for k in PROXIES:
+        async with proxy_cvs[k]:
+            proxy_view_count[k] = 0
+            proxy_cvs[k].notify_all()
+    _publish_stats()
+    logger.info("✅ View counts reset for new hour.")
+
+def _schedule_hourly_reset():
+    # Re-armed from the wall clock every hour so resets stay on the hour.
+    wait_time = _seconds_until_next_hour()
+    logger.info(f"Next view count reset in {wait_time/60:.2f} min")
+    _loop.call_later(wait_time, _on_hourly_reset)
+
+# The loop only holds weak references to tasks; keep resets alive until they finish.
+_reset_tasks: set = set()
+
+def _reset_done(task: asyncio.Task):
+    _reset_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Hourly view count reset failed", exc_info=task.exception())
+
+def _on_hourly_reset():
+    task = _loop.create_task(_reset_counts())
+    _reset_tasks.add(task)
+    task.add_done_callback(_reset_done)
+    _schedule_hourly_reset()
+
+# Snapshot rebuilt whenever a counter changes, so /status never touches the
+# counters or the event loop.
+_stats_cache = ""
+_stats_lock = Lock()
+
+def _publish_stats():
+    # Only called on the event-loop thread, which is the sole writer of the counters.
+    global _stats_cache
+    stats = "\n".join([
+        f"{k}: {proxy_view_count[k]} this hour, {proxy_total_count[k]} total"
+        for k in PROXIES
+    ])
+    with _stats_lock:
+        _stats_cache = stats
+
+_publish_stats()
 
 def get_proxy_stats() -> str:
-    with proxy_lock:
-        stats = "\n".join([
-            f"{k}: {proxy_view_count[k]} this hour, {proxy_total_count[k]} total"
-            for k in PROXIES
-        ])
-    return stats
+    with _stats_lock:
+        return _stats_cache
 
 # ========== Advanced Cross Button Detection ==========
 
+# Heuristics are evaluated in-process against the page source (one Appium round-trip
+# per poll) instead of issuing one UiAutomator query per heuristic. They are plain
+# XPath equality/contains probes over a closed keyword set, no regex or case-folding.
+CROSS_KEYWORDS = ("close", "cross", "skip", "dismiss", "exit", "x")
+CROSS_KEYWORD_VARIANTS = tuple(sorted({v for k in CROSS_KEYWORDS for v in (k, k.capitalize(), k.upper())}))
+# A bare "x" is a substring of far too many resource ids to be useful there.
+CROSS_ID_KEYWORDS = tuple(k for k in CROSS_KEYWORDS if len(k) > 1)
+
+def _equals_any_xpath(attr: str) -> etree.XPath:
+    predicate = " or ".join(f"@{attr}='{v}'" for v in CROSS_KEYWORD_VARIANTS)
+    return etree.XPath(f"//*[{predicate}]")
+
+def _id_name_contains_any_xpath() -> etree.XPath:
+    # Only the entry name after ':id/'; the package prefix may itself contain a keyword.
+    predicate = " or ".join(f"contains(substring-after(@resource-id, ':id/'), '{k}')" for k in CROSS_ID_KEYWORDS)
+    return etree.XPath(f"//*[{predicate}]")
+
 CROSS_BUTTON_HEURISTICS = [
-    # (strategy name, lambda for UiAutomator selector)
-    ("desc_contains", lambda: 'new UiSelector().descriptionMatches("(?i)(close|cross|skip|dismiss|exit|x)")'),
-    ("text_contains", lambda: 'new UiSelector().textMatches("(?i)(close|cross|skip|dismiss|exit|x)")'),
-    ("id_contains", lambda: 'new UiSelector().resourceIdMatches("(?i)(close|cross|skip|dismiss|exit|x)")'),
-    ("class_imagebutton", lambda: 'new UiSelector().className("android.widget.ImageButton")'),
-    ("class_imageview", lambda: 'new UiSelector().className("android.widget.ImageView")'),
-    ("clickable_x", lambda: 'new UiSelector().text("X").clickable(true)'),
-    ("desc_exact_x", lambda: 'new UiSelector().description("X")'),
+    # (strategy name, compiled XPath over the page source hierarchy), in priority order:
+    # exact desc/text matches first, the looser id substring probe last
+    ("desc_equals", _equals_any_xpath("content-desc")),
+    ("text_equals", _equals_any_xpath("text")),
+    ("id_contains", _id_name_contains_any_xpath()),
 ]
 
-def find_all_possible_cross_buttons(driver) -> List:
+# UiSelector union of the same probes: UiAutomator2 treats ';'-separated selectors
+# as one lookup. With an implicit wait set, the Appium server re-runs the whole union
+# on the device about every 500 ms until something matches or the wait expires, so
+# the client makes one round-trip and the polling happens server-side.
+# UiSelector has no substring match for resource ids, so the id probe has to be a
+# resourceIdMatches regex; it is the only regex left and runs once per server retry.
+# It is anchored after ':id/' so a keyword in the package name cannot match every id.
+CROSS_BUTTON_WAIT_SELECTOR = ";".join(
+    [f'new UiSelector().description("{v}")' for v in CROSS_KEYWORD_VARIANTS]
+    + [f'new UiSelector().text("{v}")' for v in CROSS_KEYWORD_VARIANTS]
+    + [f'new UiSelector().resourceIdMatches(".*:id/.*({"|".join(CROSS_ID_KEYWORDS)}).*")']
+)
+CROSS_BUTTON_TIMEOUT = 50
+
+_BOUNDS_RE = re.compile(r"\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]")
+
+# Shared by all proxies, so sized to keep every proxy's latest frames resident.
+@lru_cache(maxsize=2 * len(PROXIES))
+def _parse_page_source(source: str):
+    # Appium prefixes the hierarchy with an encoding declaration, which lxml
+    # only accepts on bytes input.
+    return etree.fromstring(source.encode("utf-8"))
+
+def _bounds_to_rect(bounds: Optional[str]) -> Optional[Dict[str, int]]:
+    m = _BOUNDS_RE.fullmatch(bounds or "")
+    if not m:
+        return None
+    x1, y1, x2, y2 = map(int, m.groups())
+    if x2 <= x1 or y2 <= y1:
+        return None
+    return {'x': x1, 'y': y1, 'width': x2 - x1, 'height': y2 - y1}
+
+def find_all_possible_cross_buttons(driver) -> List[Dict[str, int]]:
+    """Return the screen rects of all cross/close candidates, best first."""
+    try:
+        tree = _parse_page_source(driver.page_source)
+    except Exception as e:
+        logger.debug(f"Could not fetch/parse page source for cross detection: {e}")
+        return []
     found = []
+    # Keyed on the on-screen rectangle, so wrapper nodes sharing a button's bounds
+    # and hits from several heuristics collapse into one candidate.
     tried = set()
-    for name, selector_lambda in CROSS_BUTTON_HEURISTICS:
+    for name, xpath in CROSS_BUTTON_HEURISTICS:
         try:
-            sel = selector_lambda()
-            elements = driver.find_elements_by_android_uiautomator(sel)
-            for el in elements:
-                elid = getattr(el, 'id', None) or id(el)
-                if elid not in tried:
-                    found.append(el)
-                    tried.add(elid)
-            if elements:
-                logger.info(f"[AdClose] Heuristic '{name}' found {len(elements)} candidates.")
+            nodes = xpath(tree)
+            for node in nodes:
+                bounds = node.get('bounds')
+                if bounds in tried:
+                    continue
+                rect = _bounds_to_rect(bounds)
+                if rect is not None:
+                    found.append(rect)
+                    tried.add(bounds)
+            if nodes:
+                logger.info(f"[AdClose] Heuristic '{name}' found {len(nodes)} candidates.")
         except Exception as e:
             logger.debug(f"Error running cross heuristic '{name}': {e}")
-    try:
-        clickable = driver.find_elements_by_android_uiautomator('new UiSelector().clickable(true)')
-        for el in clickable:
-            sz = el.size
-            if sz['width'] <= 120 and sz['height'] <= 120:
-                elid = getattr(el, 'id', None) or id(el)
-                if elid not in tried:
-                    found.append(el)
-                    tried.add(elid)
-    except Exception as e:
-        logger.debug(f"Error in small clickable fallback: {e}")
     logger.info(f"[AdClose] Total cross/close button candidates found: {len(found)}")
     return found
 
+def wait_for_cross_button(driver, timeout: float) -> Optional[bool]:
+    """One round-trip; the server polls until a cross/close candidate appears or `timeout` expires.
+
+    Returns True if a candidate appeared, False on timeout, None if the wait itself failed.
+    """
+    try:
+        driver.implicitly_wait(timeout)
+        return bool(driver.find_elements_by_android_uiautomator(CROSS_BUTTON_WAIT_SELECTOR))
+    except Exception as e:
+        logger.debug(f"Server-side cross wait failed, falling back to polling: {e}")
+        return None
+    finally:
+        try:
+            driver.implicitly_wait(0)
+        except Exception as e:
+            logger.debug(f"Could not reset implicit wait: {e}")
+
 # ========== Ad Interaction Logic (Hyper-Advanced) ==========
 
-def watch_ads(proxy_id: str):
+# Repeated identical worker failures (e.g. a dead driver) are logged with a
+# traceback at most once per interval; the rest are only counted.
+EXCEPTION_LOG_INTERVAL = 30
+_last_exception_log: Dict[tuple, float] = {}
+_suppressed_exceptions: Dict[tuple, int] = defaultdict(int)
+
+def _log_worker_exception(proxy_id: str, exc: Exception):
+    key = (proxy_id, type(exc).__name__)
+    now = time.monotonic()
+    if now - _last_exception_log.get(key, float('-inf')) < EXCEPTION_LOG_INTERVAL:
+        _suppressed_exceptions[key] += 1
+        logger.debug("[%s] Suppressed repeated %s: %s", proxy_id, key[1], exc)
+        return
+    _last_exception_log[key] = now
+    suppressed = _suppressed_exceptions.pop(key, 0)
+    logger.exception("[%s] Exception occurred (%d similar suppressed since last report)", proxy_id, suppressed)
+
+def _flush_suppressed_exceptions(proxy_id: str):
+    # Called once the worker completes an iteration, so counts collapsed during a
+    # failure burst are reported even if that exception never recurs.
+    for key in [k for k in _suppressed_exceptions if k[0] == proxy_id]:
+        logger.info("[%s] %d repeated %s suppressed before recovery", proxy_id, _suppressed_exceptions.pop(key), key[1])
+
+async def watch_ads(proxy_id: str):
     try:
-        driver = create_driver(proxy_id)
+        driver = await asyncio.to_thread(create_driver, proxy_id)
     except Exception as e:
         logger.error(f"[{proxy_id}] Could not start Appium driver: {e}")
         return
@@ -268,90 +477,99 @@ def watch_ads(proxy_id: str):
 
     while True:
         try:
-            with proxy_lock:
-                count = proxy_view_count[proxy_id] + 1
+            cv = proxy_cvs[proxy_id]
+            async with cv:
                 if proxy_view_count[proxy_id] >= MAX_VIEWS_PER_HOUR:
                     logger.info(f"[{proxy_id}] Reached {MAX_VIEWS_PER_HOUR} views this hour. Pausing until next hour.")
-                    time.sleep(60)
-                    continue
-                if proxy_total_count[proxy_id] >= MAX_TOTAL_VIEWS_PER_PROXY:
-                    logger.info(f"[{proxy_id}] Reached session max views. Halting for QA purposes.")
-                    break
+                    # Released while waiting; _reset_counts wakes us.
+                    await cv.wait_for(lambda: proxy_view_count[proxy_id] < MAX_VIEWS_PER_HOUR)
+                    logger.info(f"[{proxy_id}] Hourly views reset. Resuming.")
+                count = proxy_view_count[proxy_id] + 1
+                total_views = proxy_total_count[proxy_id]
+            if total_views >= MAX_TOTAL_VIEWS_PER_PROXY:
+                logger.info(f"[{proxy_id}] Reached session max views. Halting for QA purposes.")
+                break
 
-            random_sleep(*HUMAN_SLEEP_VARIANCE['start_delay'], reason="ad start delay")
-            maybe_idle()
+            await humanized_wait(*HUMAN_SLEEP_VARIANCE['start_delay'], reason="ad start delay")
 
             # Session diversity: sometimes swipe or do something else
             if random.random() < 0.2:
-                advanced_human_swipe(driver)
+                await asyncio.to_thread(advanced_human_swipe, driver)
             if random.random() < 0.1:
-                simulate_device_event(driver)
+                await simulate_device_event(driver)
             if random.random() < 0.05:
                 simulate_sensor_events(driver)
 
             # Odd/even logic for Interstitial/Rewarded
             if count % 2 == 1:
                 logger.info(f"[{proxy_id}] Looking for Interstitial button (odd count: {count})")
-                ad_btns = driver.find_elements_by_android_uiautomator(
-                    'new UiSelector().textContains("Interstitial")'
-                )
+                chosen_id = INTERSTITIAL_ACCESSIBILITY_ID
             else:
                 logger.info(f"[{proxy_id}] Looking for Rewarded button (even count: {count})")
-                ad_btns = driver.find_elements_by_android_uiautomator(
-                    'new UiSelector().textContains("Rewarded")'
-                )
+                chosen_id = REWARDED_ACCESSIBILITY_ID
 
-            if not ad_btns:
+            try:
+                ad_btn = await asyncio.to_thread(driver.find_element_by_accessibility_id, chosen_id)
+            except NoSuchElementException:
                 logger.info(f"[{proxy_id}] No ad button found. Retrying after short delay.")
-                random_sleep(2, 4, reason="retry ad button")
+                await random_sleep(2, 4, reason="retry ad button")
                 continue
 
-            logger.info(f"[{proxy_id}] Found {len(ad_btns)} ad button(s). Clicking one.")
-            human_tap(driver, random.choice(ad_btns))
+            logger.info(f"[{proxy_id}] Found ad button '{chosen_id}'. Clicking it.")
+            await human_tap(driver, ad_btn)
             logger.info(f"[{proxy_id}] Ad started. Waiting for ad to finish...")
 
-            random_sleep(*HUMAN_SLEEP_VARIANCE['ad_wait'], reason="ad duration")
-            maybe_idle()
+            await humanized_wait(*HUMAN_SLEEP_VARIANCE['ad_wait'], reason="ad duration")
 
             close_found = False
-            timeout = time.time() + 50
+            timeout = time.time() + CROSS_BUTTON_TIMEOUT
+            appeared = await asyncio.to_thread(wait_for_cross_button, driver, CROSS_BUTTON_TIMEOUT)
 
-            while time.time() < timeout:
-                cross_candidates = find_all_possible_cross_buttons(driver)
+            # After a hit one page-source pass suffices and after a timeout there is
+            # nothing to find; only a failed wait falls back to client-side polling.
+            while appeared is not False:
+                cross_candidates = await asyncio.to_thread(find_all_possible_cross_buttons, driver)
                 if cross_candidates:
                     logger.info(f"[{proxy_id}] Cross/Close button detected, attempting to tap.")
-                    human_tap(driver, cross_candidates[0])
+                    await human_tap_rect(driver, cross_candidates[0])
                     close_found = True
                     logger.info(f"[{proxy_id}] Ad closed successfully.")
                     break
-                time.sleep(random.uniform(1, 2))
+                if appeared or time.time() >= timeout:
+                    break
+                await asyncio.sleep(random.uniform(1, 2))
 
             if not close_found:
                 logger.warning(f"[{proxy_id}] No cross/close button found after ad. Skipping to next ad.")
 
-            with proxy_lock:
+            async with proxy_cvs[proxy_id]:
                 proxy_view_count[proxy_id] += 1
                 proxy_total_count[proxy_id] += 1
+                _publish_stats()
+                _flush_suppressed_exceptions(proxy_id)
                 logger.info(f"[{proxy_id}] View count: {proxy_view_count[proxy_id]} this hour, {proxy_total_count[proxy_id]} total.")
 
-            random_sleep(*HUMAN_SLEEP_VARIANCE['between_ads'], reason="between ads")
-            maybe_idle()
+            await humanized_wait(*HUMAN_SLEEP_VARIANCE['between_ads'], reason="between ads")
 
         except Exception as e:
-            tb = traceback.format_exc()
-            logger.error(f"[{proxy_id}] Exception occurred: {str(e)}\n{tb}")
-            random_sleep(*HUMAN_SLEEP_VARIANCE['fail_retry'], reason="fail retry")
+            _log_worker_exception(proxy_id, e)
+            await random_sleep(*HUMAN_SLEEP_VARIANCE['fail_retry'], reason="fail retry")
             continue
 
     try:
-        driver.quit()
+        await asyncio.to_thread(driver.quit)
     except Exception as e:
         logger.warning(f"[{proxy_id}] Appium driver quit failed: {e}")
 
 # ========== Telegram Bot Commands ==========
 
-active_threads: Dict[str, Thread] = {}
-reset_thread: Optional[Thread] = None
+active_tasks: Dict[str, Future] = {}
+
+def _run_event_loop():
+    asyncio.set_event_loop(_loop)
+    # A proxy has at most one blocking call in flight, so one worker per proxy.
+    _loop.set_default_executor(ThreadPoolExecutor(max_workers=len(PROXIES), thread_name_prefix="appium"))
+    _loop.run_forever()
 
 def start(update: Update, context: CallbackContext):
     user = update.effective_user
@@ -364,19 +582,13 @@ def start(update: Update, context: CallbackContext):
     )
     logger.info(f"User {user.username} started the bot.")
 
-    global active_threads, reset_thread
+    global active_tasks
 
-    if not active_threads:
+    # Handlers run on the dispatcher thread, so hand the coroutines to the event loop.
+    if not active_tasks:
         for proxy_id in PROXIES:
-            t = Thread(target=watch_ads, args=(proxy_id,), daemon=True)
-            t.start()
-            active_threads[proxy_id] = t
-        logger.info("All proxy watcher threads started.")
-
-    if reset_thread is None or not reset_thread.is_alive():
-        reset_thread = Thread(target=reset_views_hourly, daemon=True)
-        reset_thread.start()
-        logger.info("Hourly view count reset thread started.")
+            active_tasks[proxy_id] = asyncio.run_coroutine_threadsafe(watch_ads(proxy_id), _loop)
+        logger.info("All proxy watcher tasks started.")
 
 def help_command(update: Update, context: CallbackContext):
     update.message.reply_text(
@@ -411,6 +623,10 @@ def unknown(update: Update, context: CallbackContext):
 
 def telegram_bot():
     print_banner()
+    if not getattr(sys, "_is_gil_enabled", lambda: True)():
+        logger.info("Free-threaded interpreter detected: proxy workers run in parallel.")
+    Thread(target=_run_event_loop, name="ad-event-loop", daemon=True).start()
+    _loop.call_soon_threadsafe(_schedule_hourly_reset)
     updater = Updater(TELEGRAM_TOKEN, use_context=True)
     dp = updater.dispatcher
 